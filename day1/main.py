@@ -1,5 +1,14 @@
-from collections import defaultdict
-from typing import Dict, List
+import io
+import os
+from array import array
+from collections import defaultdict, deque
+from multiprocessing import Pool
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+# Size of the blocks read from binary inputs
+CHUNK_SIZE = 1 << 16
 
 class TrieNode:
     """A node in the Trie structure.
@@ -7,10 +16,18 @@ class TrieNode:
     Attributes:
         children (defaultdict): A dictionary of children nodes.
         is_end_of_word (int): Flag to check if it's the end of a word.
+        word (str): The word ending at this node, if any.
+        fail (TrieNode): Failure link, only set once the trie is turned into an automaton.
+        outputs (List[str]): Words matched when reaching this node, longest first.
+        depth (int): Length of the prefix spelled out by the path to this node.
     """
     def __init__(self):
         self.children = defaultdict(TrieNode)
         self.is_end_of_word = 0
+        self.word = None
+        self.fail = None
+        self.outputs = []
+        self.depth = 0
 
 def search_trie(root: TrieNode, word: str) -> int:
     """Searches for a word in a trie.
@@ -32,11 +49,12 @@ def search_trie(root: TrieNode, word: str) -> int:
     else:
         return node.is_end_of_word
 
-def build_trie(keys: List[str]) -> TrieNode:
+def build_trie(keys: List[str], reverse: bool = False) -> TrieNode:
     """Builds a trie from a list of words.
 
     Args:
         keys (List[str]): A list of words to build the trie.
+        reverse (bool, optional): Insert every word back to front. Defaults to False.
 
     Returns:
         TrieNode: The root node of the built trie.
@@ -44,11 +62,124 @@ def build_trie(keys: List[str]) -> TrieNode:
     root = TrieNode()
     for key in keys:
         node = root
-        for char in key:
+        for char in (reversed(key) if reverse else key):
+            node.children[char].depth = node.depth + 1
             node = node.children[char]
         node.is_end_of_word = 1
+        node.word = key
     return root
 
+def build_automaton(keys: List[str], reverse: bool = False) -> TrieNode:
+    """Builds an Aho-Corasick automaton from a list of words.
+
+    The trie from `build_trie` is extended with failure links and output lists
+    so every match in a line can be found in a single left-to-right pass.
+    A reversed automaton matches the words when a line is read from its end.
+
+    Args:
+        keys (List[str]): A list of words to build the automaton.
+        reverse (bool, optional): Build the automaton for back to front scans. Defaults to False.
+
+    Returns:
+        TrieNode: The root node of the automaton.
+    """
+    root = build_trie(keys, reverse)
+    root.fail = root
+    # Breadth first so failure links always point to an already finished node
+    queue = deque()
+    for child in root.children.values():
+        child.fail = root
+        child.outputs = [child.word] if child.word is not None else []
+        queue.append(child)
+    while queue:
+        node = queue.popleft()
+        for char, child in node.children.items():
+            # Follow failure links until a node can be extended by this character
+            fail = node.fail
+            while fail is not root and char not in fail.children:
+                fail = fail.fail
+            child.fail = fail.children[char] if char in fail.children else root
+            # Own word first, so matches at the same position come out in start order
+            own_word = [child.word] if child.word is not None else []
+            child.outputs = own_word + child.fail.outputs
+            queue.append(child)
+    return root
+
+class CompiledAutomaton(NamedTuple):
+    """A flat, immutable form of an automaton for byte strings.
+
+    Attributes:
+        transitions (array): State x byte transition table, row `state` starts at `state * 256`.
+        values (array): Converted number for the longest word ending in each state, -1 if none.
+        lengths (array): Length of that longest word, 0 if none.
+        depths (array): Length of the prefix each state stands for.
+    """
+    transitions: array
+    values: array
+    lengths: array
+    depths: array
+
+def compile_automaton(root: TrieNode, conversion_dict: Dict[str, int]) -> CompiledAutomaton:
+    """Compiles an automaton into a dense transition table.
+
+    Failure links are folded into the table, so matching is a single integer
+    lookup per byte with no node objects involved.
+
+    Args:
+        root (TrieNode): The root node of an automaton from `build_automaton`.
+        conversion_dict (Dict[str, int]): A dictionary for number conversion.
+
+    Returns:
+        CompiledAutomaton: The compiled automaton, with the root as state 0.
+    """
+    # Numbering states breadth first, so failure states are always filled in before use
+    nodes = [root]
+    state_ids = {id(root): 0}
+    queue = deque([root])
+    while queue:
+        node = queue.popleft()
+        for child in node.children.values():
+            state_ids[id(child)] = len(nodes)
+            nodes.append(child)
+            queue.append(child)
+    transitions = array('i', bytes(4 * 256 * len(nodes)))
+    values = array('i', [-1] * len(nodes))
+    lengths = array('i', [0] * len(nodes))
+    depths = array('i', [node.depth for node in nodes])
+    for state, node in enumerate(nodes):
+        if node.outputs:
+            values[state] = int(conversion_dict[node.outputs[0]])
+            lengths[state] = len(node.outputs[0])
+        # Missing transitions copy the failure state's row (the root stays on 0)
+        if node is not root:
+            fail_row = state_ids[id(node.fail)] * 256
+            transitions[state * 256:(state + 1) * 256] = transitions[fail_row:fail_row + 256]
+        for char, child in node.children.items():
+            if ord(char) > 255:
+                raise ValueError(f"Cannot compile non single byte character: {char!r}")
+            transitions[state * 256 + ord(char)] = state_ids[id(child)]
+    return CompiledAutomaton(transitions, values, lengths, depths)
+
+def search_automaton(root: TrieNode, line: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """Finds every word of an automaton in a line in one pass.
+
+    Args:
+        root (TrieNode): The root node of an automaton from `build_automaton`.
+        line (Iterable[str]): The string line (or its characters) to search words in.
+
+    Yields:
+        Tuple[int, str]: The end index and the word for each match, in order.
+    """
+    node = root
+    for index, char in enumerate(line):
+        # Fall back along failure links (reading via `in` so no nodes get created)
+        while node is not root and char not in node.children:
+            node = node.fail
+        if char in node.children:
+            node = node.children[char]
+        for word in node.outputs:
+            yield index, word
+
 '''
 This code finds the first and last number in a given line of text
 '''
@@ -111,33 +242,355 @@ def find_number(line: str, conversion_dict: Dict[str, int], trie: TrieNode) -> i
         print("Empty string!!!")
     return total
 
-def sum_strings(string: str, conversion_dict: Dict[str, int], trie: TrieNode) -> int:
-    """Sums up numbers in a multiline string based on a trie.
+def find_number_automaton(line: str, conversion_dict: Dict[str, int], automaton: TrieNode) -> int:
+    """Finds numbers in a string line based on an Aho-Corasick automaton.
+
+    Args:
+        line (str): The string line to search numbers in.
+        conversion_dict (Dict[str, int]): A dictionary for number conversion.
+        automaton (TrieNode): The automaton to use for searching.
+
+    Returns:
+        int: The total of the numbers found.
+    """
+    # Matches come out in end order, so first and last are picked by start (longest word on ties)
+    first, last = None, None
+    for index, word in search_automaton(automaton, line):
+        match = (index - len(word) + 1, len(word), word)
+        if first is None or (match[0], -match[1]) < (first[0], -first[1]):
+            first = match
+        if last is None or match[:2] > last[:2]:
+            last = match
+    if first is None:
+        return ""
+    return conversion_dict[first[2]] + conversion_dict[last[2]]
+
+def find_first_last(line: str, conversion_dict: Dict[str, int], automaton: TrieNode, reverse_automaton: TrieNode) -> int:
+    """Finds the first and last number in a string line, scanning from both ends.
+
+    The forward scan stops once no open prefix can start before the earliest
+    match, and the backward scan (over the reversed automaton) stops at the
+    first match from the end, whose longest word has the latest start. The
+    cost depends on where the numbers sit rather than on the length of the line.
+
+    >>> keys = {'abcd': '1', 'bc': '2'}
+    >>> find_first_last('xabcdx', keys, build_automaton(keys), build_automaton(keys, reverse=True))
+    12
+
+    Args:
+        line (str): The string line to search numbers in.
+        conversion_dict (Dict[str, int]): A dictionary for number conversion.
+        automaton (TrieNode): The automaton to use for the forward scan.
+        reverse_automaton (TrieNode): The reversed automaton to use for the backward scan.
+
+    Returns:
+        int: The two digit number made from the first and last number, 0 if there are none.
+    """
+    # Forward scan, keeping the earliest start (longest word on ties) until every open prefix starts later
+    first = None
+    node = automaton
+    for index, char in enumerate(line):
+        while node is not automaton and char not in node.children:
+            node = node.fail
+        if char in node.children:
+            node = node.children[char]
+        if node.outputs:
+            match = (index - len(node.outputs[0]) + 1, -len(node.outputs[0]), node.outputs[0])
+            if first is None or match < first:
+                first = match
+        if first is not None and index - node.depth + 1 > first[0]:
+            break
+    if first is None:
+        return 0
+    # Backward scan, stopping at the first match from the end
+    last = next(search_automaton(reverse_automaton, reversed(line)))
+    return int(conversion_dict[first[2]]) * 10 + int(conversion_dict[last[1]])
+
+def find_first_last_compiled(line: bytes, automaton: CompiledAutomaton, reverse_automaton: CompiledAutomaton) -> int:
+    """Finds the first and last number in a byte line using compiled automatons.
+
+    Args:
+        line (bytes): The byte line to search numbers in.
+        automaton (CompiledAutomaton): The compiled automaton for the forward scan.
+        reverse_automaton (CompiledAutomaton): The compiled reversed automaton for the backward scan.
+
+    Returns:
+        int: The two digit number made from the first and last number, 0 if there are none.
+
+    >>> keys = {'abcd': '1', 'bc': '2'}
+    >>> forward = compile_automaton(build_automaton(keys), keys)
+    >>> backward = compile_automaton(build_automaton(keys, reverse=True), keys)
+    >>> find_first_last_compiled(b'xabcdx', forward, backward)
+    12
+    """
+    # Forward scan, keeping the earliest start (longest word on ties) until every open prefix starts later
+    transitions, values, lengths, depths = automaton
+    state, first, first_start, first_length = 0, -1, 0, 0
+    for index, byte in enumerate(line):
+        state = transitions[(state << 8) | byte]
+        if values[state] >= 0:
+            start = index - lengths[state] + 1
+            if first < 0 or start < first_start or (start == first_start and lengths[state] > first_length):
+                first, first_start, first_length = values[state], start, lengths[state]
+        if first >= 0 and index - depths[state] + 1 > first_start:
+            break
+    if first < 0:
+        return 0
+    # Backward scan, stopping at the first match from the end
+    transitions, values, _, _ = reverse_automaton
+    state = 0
+    for byte in reversed(line):
+        state = transitions[(state << 8) | byte]
+        if values[state] >= 0:
+            return first * 10 + values[state]
+
+def iter_lines(source: Union[str, Iterable[Union[str, bytes]], BinaryIO], chunk_size: int = CHUNK_SIZE) -> Iterator[Union[str, bytes]]:
+    """Yields the non-empty lines of a string, an iterable of lines or a binary file.
+
+    Binary files are read in fixed-size chunks and split at newlines, so only
+    one chunk (plus a partial line) is held in memory at a time.
 
     Args:
-        string (str): The multiline string to process.
+        source (Union[str, Iterable[Union[str, bytes]], BinaryIO]): The input to split into lines.
+        chunk_size (int, optional): Bytes read per chunk from binary files. Defaults to CHUNK_SIZE.
+
+    Yields:
+        Union[str, bytes]: Each line without its line ending.
+    """
+    if isinstance(source, str):
+        # Separating string into lines
+        lines = source.strip().split('\n')
+    elif isinstance(source, (io.RawIOBase, io.BufferedIOBase)):
+        lines = _iter_chunked_lines(source, chunk_size)
+    else:
+        lines = source
+    for line in lines:
+        line = line.rstrip()
+        if line:
+            yield line
+
+def _iter_chunked_lines(file: BinaryIO, chunk_size: int, end: Optional[int] = None) -> Iterator[bytes]:
+    """Splits a binary file into lines, reading it in fixed-size chunks.
+
+    Args:
+        file (BinaryIO): The binary file to read.
+        chunk_size (int): Bytes read per chunk.
+        end (Optional[int]): Byte offset to stop reading at, defaults to the end of the file.
+
+    Yields:
+        bytes: Each line of the file.
+    """
+    remainder = b''
+    while True:
+        if end is not None:
+            chunk_size = min(chunk_size, end - file.tell())
+        chunk = file.read(chunk_size) if chunk_size > 0 else b''
+        if not chunk:
+            break
+        lines = (remainder + chunk).split(b'\n')
+        # The last piece may be cut off mid line, carry it into the next chunk
+        remainder = lines.pop()
+        yield from lines
+    if remainder:
+        yield remainder
+
+def iter_blocks(source: Union[str, Iterable[Union[str, bytes]], BinaryIO], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yields blocks of whole lines from a string, an iterable of lines or a binary file.
+
+    Args:
+        source (Union[str, Iterable[Union[str, bytes]], BinaryIO]): The input to split into blocks.
+        chunk_size (int, optional): Rough size of each block in bytes. Defaults to CHUNK_SIZE.
+
+    Yields:
+        bytes: Blocks of newline separated lines, never cutting a line in two.
+    """
+    if isinstance(source, str):
+        yield source.encode()
+    elif isinstance(source, (io.RawIOBase, io.BufferedIOBase)):
+        remainder = b''
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            chunk = remainder + chunk
+            # Cut after the last newline, carrying the partial line into the next block
+            cut = chunk.rfind(b'\n') + 1
+            if cut:
+                yield chunk[:cut]
+            remainder = chunk[cut:]
+        if remainder:
+            yield remainder
+    else:
+        batch, batch_size = [], 0
+        for line in source:
+            line = line if isinstance(line, bytes) else line.encode()
+            batch.append(line.rstrip(b'\n'))
+            batch_size += len(line)
+            if batch_size >= chunk_size:
+                yield b'\n'.join(batch)
+                batch, batch_size = [], 0
+        if batch:
+            yield b'\n'.join(batch)
+
+def is_digit_only(conversion_dict: Optional[Dict[str, int]]) -> bool:
+    """Checks if a conversion dictionary maps single bytes to single digits.
+
+    Args:
+        conversion_dict (Optional[Dict[str, int]]): Dictionary for number conversion.
+
+    Returns:
+        bool: True if the vectorized digit path can be used.
+    """
+    return bool(conversion_dict) and all(
+        len(key) == 1 and ord(key) < 256 and str(value) in "0123456789" and len(str(value)) == 1
+        for key, value in conversion_dict.items()
+    )
+
+def sum_digits_vectorized(block: bytes, conversion_dict: Dict[str, int]) -> int:
+    """Sums up first and last digits of every line in a block using NumPy.
+
+    Args:
+        block (bytes): Newline separated lines.
+        conversion_dict (Dict[str, int]): Dictionary mapping single characters to digits.
+
+    Returns:
+        int: The sum of the two digit numbers of every line, lines without digits add 0.
+    """
+    # Lookup table from byte to digit value, -1 for everything else
+    lookup = np.full(256, -1, dtype=np.int8)
+    for key, value in conversion_dict.items():
+        lookup[ord(key)] = int(value)
+    buffer = np.frombuffer(block, dtype=np.uint8)
+    values = lookup[buffer]
+    positions = np.flatnonzero(values >= 0)
+    if positions.size == 0:
+        return 0
+    # Line of each digit is the count of newlines before it
+    line_ids = np.searchsorted(np.flatnonzero(buffer == ord('\n')), positions)
+    # First and last digit of each line are where the line id changes
+    firsts = np.flatnonzero(np.diff(line_ids, prepend=-1))
+    lasts = np.append(firsts[1:] - 1, positions.size - 1)
+    first_digits = values[positions[firsts]].astype(np.int64)
+    last_digits = values[positions[lasts]].astype(np.int64)
+    return int((first_digits * 10 + last_digits).sum())
+
+def sum_strings(string: Union[str, Iterable[Union[str, bytes]], BinaryIO], conversion_dict: Dict[str, int],
+                trie: Union[TrieNode, CompiledAutomaton], reverse_trie: Optional[Union[TrieNode, CompiledAutomaton]] = None) -> int:
+    """Sums up numbers in a multiline input based on a trie.
+
+    Args:
+        string (Union[str, Iterable[Union[str, bytes]], BinaryIO]): The multiline string,
+            iterable of lines or binary file to process.
         conversion_dict (Dict[str, int]): Dictionary for number conversion.
-        trie (TrieNode): The trie to use for finding numbers.
+        trie (Union[TrieNode, CompiledAutomaton]): The trie or automaton to use for finding numbers.
+        reverse_trie (Optional[Union[TrieNode, CompiledAutomaton]]): A reversed automaton, enables the first/last only scan.
 
     Returns:
-        int: The sum of all numbers found in the string.
+        int: The sum of all numbers found in the input.
+
+    Raises:
+        ValueError: If a compiled automaton is not paired with a compiled reversed automaton.
     """
-    # Separating string into lines
-    lines = string.strip().split('\n')
+    # Compiled automatons only do the first/last scan, which needs both directions
+    if isinstance(trie, CompiledAutomaton) and not isinstance(reverse_trie, CompiledAutomaton):
+        raise ValueError("A compiled automaton needs a compiled reverse_trie for the first/last scan")
+    # Digit only conversions skip the automatons for whole block NumPy reductions
+    if is_digit_only(conversion_dict):
+        return sum(sum_digits_vectorized(block, conversion_dict) for block in iter_blocks(string))
+    lines = iter_lines(string)
+    # Compiled automatons work on the encoded lines
+    if isinstance(trie, CompiledAutomaton):
+        return sum(find_first_last_compiled(line if isinstance(line, bytes) else line.encode(), trie, reverse_trie)
+                   for line in lines)
+    # The object tries work on text
+    lines = (line.decode() if isinstance(line, bytes) else line for line in lines)
+    # First/last only mode, scanning in from both ends of each line
+    if reverse_trie is not None:
+        return sum(find_first_last(line, conversion_dict, trie, reverse_trie) for line in lines)
+    # Automatons (with failure links) can be matched in a single pass
+    finder = find_number_automaton if trie.fail is not None else find_number
     # Variable for total count
     total = 0
     # Loop to calculate totals
     for i, line in enumerate(lines):
-        number_as_string = find_number(line, conversion_dict, trie)
+        number_as_string = finder(line, conversion_dict, trie)
         total += int(number_as_string)
 
     return total
 
-if __name__ == "__main__":
-    # Loading the data
-    with open('data.txt', 'r', encoding='utf-8') as file:
-        string = file.read()
+# Compiled automatons of each worker process, set once by `_init_worker`
+_worker_automatons = None
+
+def _init_worker(conversion_dict: Dict[str, int]) -> None:
+    """Builds the compiled automatons once per worker process.
+
+    Args:
+        conversion_dict (Dict[str, int]): Dictionary for number conversion.
+    """
+    global _worker_automatons
+    _worker_automatons = (
+        compile_automaton(build_automaton(conversion_dict.keys()), conversion_dict),
+        compile_automaton(build_automaton(conversion_dict.keys(), reverse=True), conversion_dict),
+    )
+
+def _sum_shard(path: str, start: int, end: int) -> int:
+    """Sums up the numbers in one byte range of a file, inside a worker process.
+
+    Args:
+        path (str): Path to the file.
+        start (int): Byte offset of the first line in the shard.
+        end (int): Byte offset just past the last line in the shard.
+
+    Returns:
+        int: The sum of all numbers found in the shard.
+    """
+    automaton, reverse_automaton = _worker_automatons
+    with open(path, 'rb') as file:
+        file.seek(start)
+        return sum_strings(_iter_chunked_lines(file, CHUNK_SIZE, end), None, automaton, reverse_automaton)
+
+def shard_file(path: str, shards: int) -> List[Tuple[int, int]]:
+    """Splits a file into byte ranges that start and end on line boundaries.
 
+    Args:
+        path (str): Path to the file.
+        shards (int): The number of (roughly equal) byte ranges wanted.
+
+    Returns:
+        List[Tuple[int, int]]: The non-empty (start, end) byte ranges, in file order.
+    """
+    size = os.path.getsize(path)
+    offsets = [0]
+    with open(path, 'rb') as file:
+        for shard in range(1, shards):
+            # Move on to the start of the next line after the even split point
+            file.seek(max(size * shard // shards - 1, offsets[-1]))
+            file.readline()
+            offsets.append(min(file.tell(), size))
+    offsets.append(size)
+    return [(start, end) for start, end in zip(offsets, offsets[1:]) if start < end]
+
+def sum_file_parallel(path: str, conversion_dict: Dict[str, int], processes: Optional[int] = None) -> int:
+    """Sums up numbers in a file, sharded across a pool of processes.
+
+    Every worker compiles the automatons once, then handles whole byte range
+    shards of the file and the partial totals are added up.
+
+    Args:
+        path (str): Path to the file.
+        conversion_dict (Dict[str, int]): Dictionary for number conversion.
+        processes (Optional[int]): Number of worker processes, defaults to the core count.
+
+    Returns:
+        int: The sum of all numbers found in the file.
+    """
+    processes = processes or os.cpu_count() or 1
+    # A few shards per process keeps the workers busy when shards finish unevenly
+    shards = shard_file(path, processes * 4)
+    with Pool(processes, initializer=_init_worker, initargs=(conversion_dict,)) as pool:
+        return sum(pool.starmap(_sum_shard, [(path, start, end) for start, end in shards]))
+
+if __name__ == "__main__":
     # Dictionary for number conversion
     number_conversion = {
         "1": "1",
@@ -151,8 +604,9 @@ if __name__ == "__main__":
         "9": "9",
     }
 
-    # Generating the trie for the number only version
-    number_trie = build_trie(number_conversion.keys())
+    # Generating the automaton for the number only version
+    number_trie = compile_automaton(build_automaton(number_conversion.keys()), number_conversion)
+    number_reverse_trie = compile_automaton(build_automaton(number_conversion.keys(), reverse=True), number_conversion)
 
     # Dictionary for number and string conversion
     number_and_string_conversion = {
@@ -176,12 +630,18 @@ if __name__ == "__main__":
         "9": "9",
     }
 
-    # Generating the trie for the number and string version
-    number_and_string_trie = build_trie(number_and_string_conversion.keys())
+    # Generating the automaton for the number and string version
+    number_and_string_trie = compile_automaton(build_automaton(number_and_string_conversion.keys()),
+                                               number_and_string_conversion)
+    number_and_string_reverse_trie = compile_automaton(build_automaton(number_and_string_conversion.keys(), reverse=True),
+                                                       number_and_string_conversion)
 
-    # Results
-    number_total_test_prediction = sum_strings(string, number_conversion, number_trie)
-    number_and_string_total_test_prediction = sum_strings(string, number_and_string_conversion, number_and_string_trie)
+    # Results, streaming the data straight from the file
+    with open('data.txt', 'rb') as file:
+        number_total_test_prediction = sum_strings(file, number_conversion, number_trie, number_reverse_trie)
+    with open('data.txt', 'rb') as file:
+        number_and_string_total_test_prediction = sum_strings(file, number_and_string_conversion,
+                                                              number_and_string_trie, number_and_string_reverse_trie)
     
     # Printing results
     print("Number Total Test Prediction:", number_total_test_prediction)
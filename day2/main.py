@@ -1,5 +1,22 @@
 import math
-from typing import Dict, Optional
+from typing import Dict, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+# Column order of the colour axis in a GameTable
+COLOURS = ('red', 'green', 'blue')
+# Most cells held at once by the dominance cube, or by one chunk of the fallback comparison
+MAX_INDEX_CELLS = 1 << 22
+
+class GameTable(NamedTuple):
+    """Columnar summary of a game log.
+
+    Attributes:
+        ids (np.ndarray): The id of each game.
+        maxima (np.ndarray): The (games x 3) maximum red, green and blue cubes shown in each game.
+    """
+    ids: np.ndarray
+    maxima: np.ndarray
 
 def per_game_challenge_one(id: str, games_info_string: str, max_cubes: Dict[str, int]) -> int:
     """
@@ -62,6 +79,169 @@ def per_game_challenge_two(games_info_string: str) -> int:
     # Returning the product of the max values
     return math.prod(cube_maxes.values())
 
+class CubeTokens(NamedTuple):
+    """Flat token arrays for a game log, one entry per cube draw.
+
+    Attributes:
+        ids (np.ndarray): The id of each game, in log order.
+        games (np.ndarray): Index into `ids` of the game each draw belongs to.
+        colours (np.ndarray): Colour index (into COLOURS) of each draw.
+        counts (np.ndarray): Number of cubes in each draw.
+    """
+    ids: np.ndarray
+    games: np.ndarray
+    colours: np.ndarray
+    counts: np.ndarray
+
+def tokenize_games(data: Union[bytes, bytearray, memoryview]) -> CubeTokens:
+    """
+    Tokenizes a game log in a single vectorized pass over its bytes.
+
+    Every run of digits is a number; one followed by ':' is a game id and one
+    followed by a space is a cube count, whose colour is read from the first
+    letter after the space. No per-token strings are created.
+
+    Args:
+        data (Union[bytes, bytearray, memoryview]): The raw game log.
+
+    Returns:
+        CubeTokens: The game ids and the (game, colour, count) triples of every draw.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    # Edges of the digit runs
+    is_digit = (buffer >= ord('0')) & (buffer <= ord('9'))
+    edges = np.diff(is_digit.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    lengths = ends - starts
+    # Building the values digit by digit, only the longest number needs a pass
+    values = np.zeros(len(starts), dtype=np.int64)
+    for k in range(int(lengths.max(initial=0))):
+        active = lengths > k
+        values[active] = values[active] * 10 + buffer[starts[active] + k] - ord('0')
+    # Classifying each number by the byte after it (and after that, for the colour),
+    # clamping the reads so a number at the very end of the buffer is simply ignored
+    last = len(buffer) - 1
+    following = np.where(ends <= last, buffer[np.minimum(ends, last)], 0)
+    colour_lookup = np.full(256, -1, dtype=np.int8)
+    for i, colour in enumerate(COLOURS):
+        colour_lookup[ord(colour[0])] = i
+    colours = np.where(ends + 1 <= last, colour_lookup[buffer[np.minimum(ends + 1, last)]], -1)
+    is_id = following == ord(':')
+    is_count = (following == ord(' ')) & (colours >= 0)
+    # Each draw belongs to the last game id before it
+    games = np.cumsum(is_id)[is_count] - 1
+    return CubeTokens(values[is_id], games, colours[is_count].astype(np.intp), values[is_count])
+
+def parse_games(data: Union[str, bytes, bytearray, memoryview]) -> GameTable:
+    """
+    Parses the game data once into a columnar table of per-game maximum cube counts.
+
+    Args:
+        data (Union[str, bytes, bytearray, memoryview]): Multiple lines of game data.
+
+    Returns:
+        GameTable: The game ids and their maximum red, green and blue counts.
+    """
+    tokens = tokenize_games(data.encode() if isinstance(data, str) else data)
+    maxima = np.zeros((len(tokens.ids), len(COLOURS)), dtype=np.int64)
+    np.maximum.at(maxima, (tokens.games, tokens.colours), tokens.counts)
+    return GameTable(tokens.ids, maxima)
+
+def possible_games_total(table: GameTable, max_cubes: Dict[str, int]) -> int:
+    """
+    Sums the ids of the games that are possible with a given bag of cubes.
+
+    Args:
+        table (GameTable): The parsed game table.
+        max_cubes (Dict[str, int]): A dictionary mapping colors to the maximum number of cubes allowed.
+
+    Returns:
+        int: The sum of the ids of all possible games.
+    """
+    limits = np.array([max_cubes[colour] for colour in COLOURS])
+    possible = (table.maxima <= limits).all(axis=1)
+    return int(table.ids[possible].sum())
+
+def power_total(table: GameTable) -> int:
+    """
+    Sums the power (product of the minimum cubes needed) of every game.
+
+    Args:
+        table (GameTable): The parsed game table.
+
+    Returns:
+        int: The total power over all games.
+    """
+    # Colours never shown count as 1, as in `per_game_challenge_two`
+    return int(np.maximum(table.maxima, 1).prod(axis=1).sum())
+
+class DominanceIndex(NamedTuple):
+    """3D prefix sums of game ids over the per-game maxima.
+
+    Attributes:
+        axes (Tuple[np.ndarray, np.ndarray, np.ndarray]): Sorted distinct maxima per colour.
+        prefix (Optional[np.ndarray]): Entry [r, g, b] holds the id sum of games whose maxima are within
+            the first r red, g green and b blue axis values (index 0 meaning none). None when the
+            cube would exceed MAX_INDEX_CELLS.
+        table (GameTable): The game table, compared against directly when there is no prefix cube.
+    """
+    axes: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    prefix: Optional[np.ndarray]
+    table: GameTable
+
+def build_dominance_index(table: GameTable) -> DominanceIndex:
+    """
+    Builds a dominance index over the game table for batched bag queries.
+
+    The prefix cube has one cell per combination of distinct red, green and
+    blue maxima, so it grows with the cube of the number of distinct counts.
+    Above MAX_INDEX_CELLS no cube is built and `evaluate_configurations`
+    compares each configuration against the game table instead.
+
+    Args:
+        table (GameTable): The parsed game table.
+
+    Returns:
+        DominanceIndex: The index for `evaluate_configurations`.
+    """
+    axes = tuple(np.unique(table.maxima[:, i]) for i in range(len(COLOURS)))
+    if math.prod(len(axis) + 1 for axis in axes) > MAX_INDEX_CELLS:
+        return DominanceIndex(axes, None, table)
+    # Position of each game on each axis, shifted by one for the empty leading plane
+    positions = tuple(np.searchsorted(axis, table.maxima[:, i]) + 1 for i, axis in enumerate(axes))
+    prefix = np.zeros(tuple(len(axis) + 1 for axis in axes), dtype=np.int64)
+    np.add.at(prefix, positions, table.ids)
+    # Cumulative sums along every axis give the dominance sums
+    for axis in range(len(COLOURS)):
+        np.cumsum(prefix, axis=axis, out=prefix)
+    return DominanceIndex(axes, prefix, table)
+
+def evaluate_configurations(index: DominanceIndex, configurations: np.ndarray) -> np.ndarray:
+    """
+    Sums the ids of the possible games for a batch of bag configurations.
+
+    Args:
+        index (DominanceIndex): The index from `build_dominance_index`.
+        configurations (np.ndarray): An (N x 3) array of red, green and blue cube limits.
+
+    Returns:
+        np.ndarray: The sum of the ids of the possible games for each configuration.
+    """
+    configurations = np.asarray(configurations).reshape(-1, len(COLOURS))
+    if index.prefix is None:
+        # No cube, so compare against every game, a chunk of configurations at a time
+        maxima, ids = index.table.maxima, index.table.ids
+        chunk = max(1, MAX_INDEX_CELLS // max(1, maxima.size))
+        totals = np.empty(len(configurations), dtype=np.int64)
+        for start in range(0, len(configurations), chunk):
+            possible = (maxima[None, :, :] <= configurations[start:start + chunk, None, :]).all(axis=2)
+            totals[start:start + chunk] = possible @ ids
+        return totals
+    # Number of axis values within each limit, which is the prefix position to read
+    positions = tuple(np.searchsorted(axis, configurations[:, i], side='right') for i, axis in enumerate(index.axes))
+    return index.prefix[positions]
+
 def total_game_calculation(data: str, max_cubes: Optional[Dict[str, int]] = None) -> int:
     """
     Calculates the total score of all game challenges based on the provided data.
@@ -73,33 +253,16 @@ def total_game_calculation(data: str, max_cubes: Optional[Dict[str, int]] = None
     Returns:
         int: The total score calculated from all game challenges.
     """
-    # Separating lines in string into list of lines
-    lines = data.split("\n")
-    # Setting total_count
-    total_count = 0
-    # Looping for each line
-    for line in lines:
-        # If line is empty, move to next line
-        if line == '':
-           continue
-        # Separting the line information into round and game specific
-        id_info, games_info_string = line.split(":")
-        # Isolating the ID
-        id = id_info[5:]
-        if max_cubes is not None:
-            # Return the ID if impossible, else returning 0
-            round_total = per_game_challenge_one(id, games_info_string, max_cubes)
-        else:
-            # Return the product of the 
-            round_total = per_game_challenge_two(games_info_string)
-        # Adding to the total count
-        total_count += round_total
-    # Returning the total count
-    return total_count
+    table = parse_games(data)
+    if max_cubes is not None:
+        # Sum of the IDs of the possible games
+        return possible_games_total(table, max_cubes)
+    # Sum of the power of every game
+    return power_total(table)
 
 if __name__ == "__main__":
     # Loading the data
-    with open('data.txt', 'r', encoding='utf-8') as file:
+    with open('data.txt', 'rb') as file:
         string = file.read()
 
     # Dictionary for number conversion
@@ -109,9 +272,10 @@ if __name__ == "__main__":
         'blue': 14,
     }
 
-    # Gathering results
-    challenge_one_total = total_game_calculation(string, max_cubes)
-    challenge_two_total = total_game_calculation(string)
+    # Parsing once, then querying the table for both challenges
+    table = parse_games(string)
+    challenge_one_total = possible_games_total(table, max_cubes)
+    challenge_two_total = power_total(table)
 
     # Printing results
     print(f"Challenge One Answer: {challenge_one_total}")
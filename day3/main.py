@@ -1,5 +1,9 @@
+import os
 import re
 from collections import defaultdict
+from multiprocessing import Pool
+
+import numpy as np
 
 def separate_data(data):
     """
@@ -90,8 +94,162 @@ def calculate_sum_of_numbers(data, boundaries):
                 number_positions = []
     return total_count
 
+''' Grid Engine '''
+
+def load_grid(data):
+    """
+    Loads the schematic as a 2D byte array, padding short lines with periods.
+
+    Args:
+    data (str): A string containing multiple lines of data.
+
+    Returns:
+    np.ndarray: A (rows x columns) uint8 array of the schematic characters.
+    """
+    lines = data.rstrip('\n').split('\n')
+    width = max(len(line) for line in lines)
+    joined = ''.join(line.ljust(width, '.') for line in lines).encode()
+    return np.frombuffer(joined, dtype=np.uint8).reshape(len(lines), width)
+
+def symbol_mask(grid):
+    """
+    Marks the special characters (anything but digits and periods) in a grid.
+
+    Args:
+    grid (np.ndarray): A schematic from `load_grid`.
+
+    Returns:
+    np.ndarray: A boolean array, True on special characters.
+    """
+    is_digit = (grid >= ord('0')) & (grid <= ord('9'))
+    return ~is_digit & (grid != ord('.'))
+
+def dilate(mask):
+    """
+    Grows a mask by its 3x3 neighbourhood.
+
+    Args:
+    mask (np.ndarray): A 2D boolean array.
+
+    Returns:
+    np.ndarray: A boolean array, True on and around every True cell of the mask.
+    """
+    rows, columns = mask.shape
+    padded = np.pad(mask, 1)
+    dilated = np.zeros_like(mask)
+    for row_offset in range(3):
+        for col_offset in range(3):
+            dilated |= padded[row_offset:row_offset + rows, col_offset:col_offset + columns]
+    return dilated
+
+def label_number_runs(grid):
+    """
+    Labels every horizontal run of digits in a grid and works out its value.
+
+    Args:
+    grid (np.ndarray): A schematic from `load_grid`.
+
+    Returns:
+    tuple: A (rows x columns) int array with the label of the run covering each cell (0 for none),
+    and an array with the value of each label (index 0 holding 0).
+    """
+    rows, columns = grid.shape
+    is_digit = (grid >= ord('0')) & (grid <= ord('9'))
+    # A period column at the end of each row stops runs wrapping onto the next row
+    flat = np.pad(is_digit, ((0, 0), (0, 1))).ravel()
+    edges = np.diff(flat.astype(np.int8), prepend=0)
+    starts = np.flatnonzero(edges == 1)
+    lengths = np.flatnonzero(edges == -1) - starts
+    # Cumulative count of run starts gives each digit the label of its run
+    labels = (np.cumsum(edges == 1) * flat).reshape(rows, columns + 1)[:, :columns]
+    # Building the values digit by digit, only the longest number needs a pass
+    digits = np.pad(grid, ((0, 0), (0, 1)), constant_values=ord('.')).ravel()
+    values = np.zeros(len(starts) + 1, dtype=np.int64)
+    for k in range(int(lengths.max(initial=0))):
+        active = np.flatnonzero(lengths > k)
+        values[active + 1] = values[active + 1] * 10 + digits[starts[active] + k] - ord('0')
+    return labels, values
+
+def grid_sum_of_numbers(grid):
+    """
+    Calculates the sum of numbers near special characters using array operations.
+
+    Args:
+    grid (np.ndarray): A schematic from `load_grid`.
+
+    Returns:
+    int: The total sum of numbers found near special characters.
+    """
+    labels, values = label_number_runs(grid)
+    near_symbol = dilate(symbol_mask(grid))
+    # Every run with at least one digit near a special character counts once
+    touched = np.unique(labels[near_symbol & (labels > 0)])
+    return int(values[touched].sum())
+
 ''' Challenge 2 Code '''
 
+class SpanIndex:
+    """
+    A flat index from each cell to the number span covering it.
+
+    Attributes:
+    rows (int): The number of rows in the grid.
+    columns (int): The number of columns in the grid.
+    cells (np.ndarray): The span id of each cell in row major order, 0 for no number.
+    values (np.ndarray): The value of each span id, index 0 holding 0.
+    """
+    def __init__(self, grid):
+        self.rows, self.columns = grid.shape
+        labels, self.values = label_number_runs(grid)
+        self.cells = labels.ravel()
+
+    def adjacent_spans(self, row, column):
+        """
+        Finds the distinct number spans in the 3x3 box around a cell.
+
+        Args:
+        row (int): The row of the cell.
+        column (int): The column of the cell.
+
+        Returns:
+        list: The sorted span ids, each listed once however many of its digits touch the cell.
+        """
+        span_ids = set()
+        for box_row in range(max(row - 1, 0), min(row + 2, self.rows)):
+            offset = box_row * self.columns
+            for box_column in range(max(column - 1, 0), min(column + 2, self.columns)):
+                span_ids.add(int(self.cells[offset + box_column]))
+        span_ids.discard(0)
+        return sorted(span_ids)
+
+    def adjacent_numbers(self, row, column):
+        """
+        Finds the numbers next to a cell.
+
+        Args:
+        row (int): The row of the cell.
+        column (int): The column of the cell.
+
+        Returns:
+        list: The values of the distinct numbers around the cell.
+        """
+        return [int(self.values[span_id]) for span_id in self.adjacent_spans(row, column)]
+
+def find_symbol_numbers(grid, index, symbol='*'):
+    """
+    Collects the numbers next to every occurrence of a symbol using a span index.
+
+    Args:
+    grid (np.ndarray): A schematic from `load_grid`.
+    index (SpanIndex): The span index of the same grid.
+    symbol (str, optional): The symbol to look for. Defaults to '*' for gears.
+
+    Returns:
+    dict: A dictionary of symbol ids to the numbers around them, as `add_numbers_to_gears` returns.
+    """
+    positions = np.argwhere(grid == ord(symbol))
+    return {symbol_id: index.adjacent_numbers(row, column) for symbol_id, (row, column) in enumerate(positions)}
+
 def find_gears(data):
     """
     Identifies gears and their boundaries in the data.
@@ -198,21 +356,279 @@ def score_double_gears(gears):
               total_count += numbers[0] * numbers[1]
     return total_count
 
+''' Streaming Code '''
+
+# Patterns for the numbers and special characters of a row
+NUMBER_PATTERN = re.compile('[0-9]+')
+SYMBOL_PATTERN = re.compile('[^0-9.]')
+
+def find_row_numbers(line):
+    """
+    Finds the numbers in a single row.
+
+    Args:
+    line (str): A single line of data.
+
+    Returns:
+    list: A list of (start, end, value) tuples, end being one past the last digit.
+    """
+    return [(match.start(), match.end(), int(match.group())) for match in NUMBER_PATTERN.finditer(line)]
+
+def score_window_row(above, row, below):
+    """
+    Finds the part numbers and gear ratios of the middle row of a three row window.
+
+    Args:
+    above (tuple): The (line, numbers) pair of the row above, empty for the first row.
+    row (tuple): The (line, numbers) pair of the row being scored.
+    below (tuple): The (line, numbers) pair of the row below, empty for the last row.
+
+    Returns:
+    tuple: A list of the part numbers and a list of the gear ratios in the row.
+    """
+    window = (above, row, below)
+    line, numbers = row
+    # Numbers in the row with a special character in the surrounding box
+    parts = [value for start, end, value in numbers
+             if any(SYMBOL_PATTERN.search(window_line, max(start - 1, 0), end + 1) for window_line, _ in window)]
+    # Gears in the row with exactly two numbers in the surrounding box
+    ratios = []
+    column = line.find('*')
+    while column != -1:
+        adjacent = [value for _, window_numbers in window for start, end, value in window_numbers
+                    if start <= column + 1 and end >= column]
+        if len(adjacent) == 2:
+            ratios.append(adjacent[0] * adjacent[1])
+        column = line.find('*', column + 1)
+    return parts, ratios
+
+def stream_schematic(lines):
+    """
+    Streams part numbers and gear ratios from rows, keeping only a three row window.
+
+    A row is scored as soon as the row below it has been read, so memory
+    depends on the width of the schematic and not on its height.
+
+    Args:
+    lines (iterable of str): The rows of the schematic, e.g. an open file.
+
+    Yields:
+    tuple: ('part', number) for each part number and ('gear', ratio) for each gear.
+    """
+    empty = ('', [])
+    above, row = empty, None
+    for line in lines:
+        line = line.rstrip('\r\n')
+        below = (line, find_row_numbers(line))
+        if row is not None:
+            parts, ratios = score_window_row(above, row, below)
+            yield from (('part', part) for part in parts)
+            yield from (('gear', ratio) for ratio in ratios)
+            above = row
+        row = below
+    if row is not None:
+        parts, ratios = score_window_row(above, row, empty)
+        yield from (('part', part) for part in parts)
+        yield from (('gear', ratio) for ratio in ratios)
+
+def stream_totals(lines):
+    """
+    Calculates both challenge totals from streamed rows.
+
+    Args:
+    lines (iterable of str): The rows of the schematic, e.g. an open file.
+
+    Returns:
+    tuple: The sum of the part numbers and the sum of the gear ratios.
+    """
+    totals = {'part': 0, 'gear': 0}
+    for kind, value in stream_schematic(lines):
+        totals[kind] += value
+    return totals['part'], totals['gear']
+
+''' Parallel Code '''
+
+def score_tile(lines, first, last):
+    """
+    Calculates both challenge totals for the rows a tile owns.
+
+    Args:
+    lines (list of str): The tile rows, including a halo row above and below where one exists.
+    first (int): Index in lines of the first row the tile owns.
+    last (int): Index in lines one past the last row the tile owns.
+
+    Returns:
+    tuple: The sum of the part numbers and the sum of the gear ratios in the owned rows.
+    """
+    empty = ('', [])
+    rows = [(line, find_row_numbers(line)) for line in lines]
+    part_total, gear_total = 0, 0
+    for index in range(first, last):
+        above = rows[index - 1] if index > 0 else empty
+        below = rows[index + 1] if index + 1 < len(rows) else empty
+        parts, ratios = score_window_row(above, rows[index], below)
+        part_total += sum(parts)
+        gear_total += sum(ratios)
+    return part_total, gear_total
+
+def split_tiles(lines, tile_rows):
+    """
+    Splits the rows into horizontal tiles with one halo row on each side.
+
+    Args:
+    lines (list of str): The rows of the schematic.
+    tile_rows (int): The number of rows each tile owns.
+
+    Returns:
+    list: (tile lines, first, last) arguments for `score_tile`, one per tile.
+    """
+    tiles = []
+    for start in range(0, len(lines), tile_rows):
+        end = min(start + tile_rows, len(lines))
+        halo_start = max(start - 1, 0)
+        tiles.append((lines[halo_start:end + 1], start - halo_start, end - halo_start))
+    return tiles
+
+def parallel_totals(data, processes=None, tile_rows=None):
+    """
+    Calculates both challenge totals with the grid split into tiles across a pool of processes.
+
+    Numbers never span rows and every gear only looks one row up and down,
+    so each tile scores the numbers and gears of the rows it owns using its
+    halo rows. Nothing is counted twice across a boundary, and merging the
+    tiles is a plain sum that matches the single process results exactly.
+
+    Args:
+    data (str): A string containing multiple lines of data.
+    processes (int, optional): Number of worker processes, defaults to the core count.
+    tile_rows (int, optional): Rows owned by each tile, defaults to a few tiles per process.
+
+    Returns:
+    tuple: The sum of the part numbers and the sum of the gear ratios.
+    """
+    lines = data.rstrip('\n').split('\n')
+    processes = processes or os.cpu_count() or 1
+    tile_rows = tile_rows or max(len(lines) // (processes * 4), 1)
+    with Pool(processes) as pool:
+        results = pool.starmap(score_tile, split_tiles(lines, tile_rows))
+    return sum(part for part, _ in results), sum(gear for _, gear in results)
+
+''' Incremental Code '''
+
+class Schematic:
+    """
+    A schematic that keeps both challenge totals up to date as cells are edited.
+
+    Attributes:
+    grid (list of list of str): The characters of the schematic.
+    span_ids (list of list): The id of the number span covering each cell, None for no number.
+    spans (dict): Span id to (row, start, end, value), end being one past the last digit.
+    part_total (int): The sum of the part numbers.
+    gear_total (int): The sum of the gear ratios.
+    """
+    def __init__(self, data):
+        self.grid = [list(line) for line in data.rstrip('\n').split('\n')]
+        self.span_ids = [[None] * len(row) for row in self.grid]
+        self.spans = {}
+        self.next_span_id = 0
+        for row, line in enumerate(self.grid):
+            for start, end, value in find_row_numbers(''.join(line)):
+                self._add_span(row, start, end, value)
+        self.part_total = sum(span[3] for span_id, span in self.spans.items() if self._is_part(span_id))
+        self.gear_total = sum(self._gear_ratio(row, column)
+                              for row, line in enumerate(self.grid) for column, character in enumerate(line)
+                              if character == '*')
+
+    def _add_span(self, row, start, end, value):
+        """Stores a number span and marks the cells it covers."""
+        self.spans[self.next_span_id] = (row, start, end, value)
+        for column in range(start, end):
+            self.span_ids[row][column] = self.next_span_id
+        self.next_span_id += 1
+
+    def _remove_span(self, span_id):
+        """Forgets a number span and clears the cells it covered."""
+        row, start, end, _ = self.spans.pop(span_id)
+        for column in range(start, end):
+            self.span_ids[row][column] = None
+
+    def _cells_around(self, row, start, end):
+        """Yields the in-bounds cells of the box around columns [start, end) of a row, the row included."""
+        for box_row in range(max(row - 1, 0), min(row + 2, len(self.grid))):
+            for box_column in range(max(start - 1, 0), min(end + 1, len(self.grid[box_row]))):
+                yield box_row, box_column
+
+    def _is_part(self, span_id):
+        """Checks if a number span has a special character around it."""
+        row, start, end, _ = self.spans[span_id]
+        return any(self.grid[r][c] != '.' and not self.grid[r][c].isdigit() for r, c in self._cells_around(row, start, end))
+
+    def _spans_around(self, row, column):
+        """Finds the ids of the number spans in the 3x3 box around a cell."""
+        span_ids = {self.span_ids[r][c] for r, c in self._cells_around(row, column, column + 1)}
+        span_ids.discard(None)
+        return span_ids
+
+    def _gear_ratio(self, row, column):
+        """Works out the ratio of a cell, 0 unless it is a gear with exactly two numbers."""
+        if self.grid[row][column] != '*':
+            return 0
+        span_ids = self._spans_around(row, column)
+        if len(span_ids) != 2:
+            return 0
+        first, second = span_ids
+        return self.spans[first][3] * self.spans[second][3]
+
+    def update(self, row, column, character):
+        """
+        Changes a single cell and adjusts both totals.
+
+        Only spans in the 3x3 box around the cell can change shape or part
+        status, and only gears next to those spans (or to the cell) can change
+        ratio, so just those are taken out of the totals and added back.
+
+        Args:
+        row (int): The row of the cell.
+        column (int): The column of the cell.
+        character (str): The new character for the cell.
+        """
+        old_span_ids = self._spans_around(row, column)
+        # Every cell whose gear ratio could change, new spans only ever cover old span cells and this one
+        gear_cells = set(self._cells_around(row, column, column + 1))
+        for span_id in old_span_ids:
+            span_row, start, end, _ = self.spans[span_id]
+            gear_cells.update(self._cells_around(span_row, start, end))
+        # Taking the affected numbers and gears out of the totals
+        self.part_total -= sum(self.spans[span_id][3] for span_id in old_span_ids if self._is_part(span_id))
+        self.gear_total -= sum(self._gear_ratio(r, c) for r, c in gear_cells)
+        # Re-reading the numbers in this row that touch the changed cell
+        start, end = column, column + 1
+        for span_id in list(old_span_ids):
+            span_row, span_start, span_end, _ = self.spans[span_id]
+            if span_row == row and span_start <= column + 1 and span_end >= column:
+                start, end = min(start, span_start), max(end, span_end)
+                self._remove_span(span_id)
+        self.grid[row][column] = character
+        for span_start, span_end, value in find_row_numbers(''.join(self.grid[row][start:end])):
+            self._add_span(row, start + span_start, start + span_end, value)
+        # Adding the affected numbers and gears back in
+        self.part_total += sum(self.spans[span_id][3] for span_id in self._spans_around(row, column)
+                               if self._is_part(span_id))
+        self.gear_total += sum(self._gear_ratio(r, c) for r, c in gear_cells)
+
 if __name__ == "__main__":
     # Loading the data
     with open('data.txt', 'r', encoding='utf-8') as file:
         string = file.read()
 
-    # Dictionary for number conversion
-    lines = separate_data(string)
+    # Loading the schematic as a grid
+    grid = load_grid(string)
 
     # Challenge 1 results
-    boundaries = find_special_character_positions(lines)
-    challenge_one_total = calculate_sum_of_numbers(lines, boundaries)
+    challenge_one_total = grid_sum_of_numbers(grid)
 
     # Challenge 2 results
-    gears, boundaries = find_gears(lines)
-    gears = add_numbers_to_gears(lines, gears, boundaries)
+    gears = find_symbol_numbers(grid, SpanIndex(grid))
     challenge_two_total = score_double_gears(gears)
 
     # Printing results
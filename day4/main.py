@@ -1,31 +1,134 @@
+import numpy as np
+
 # Function for per line calculation
-def pre_line_calculation_one(line):
+def tokenize_card(line):
     """
-    Processes a single line of data to calculate and return the score based on winners and elves' numbers.
+    Splits a single line of data into its winning numbers and elves' numbers.
 
     Args:
         line (str): A string representing a line of data in the format 'card_id: winners | elfs'.
 
     Returns:
-        int: The calculated score for the line. Returns 0 if the score is less than 1.
+        tuple: The list of distinct winning numbers and the list of elves' numbers.
     """
     # Remove card_id_info
     _, card_info = line.split(': ')
     # Split into winners and elfs numbers
     winners, elfs = card_info.split(' | ')
-    winners_dict = {int(winning_number):0 for winning_number in winners.split()}
-    elfs_list =  [int(elfs_number) for elfs_number in elfs.split()]
-    # Adding matched numbers to winners dictionary
+    # A winning number only counts once, however often it is listed
+    winners_list = list(dict.fromkeys(int(winning_number) for winning_number in winners.split()))
+    elfs_list = [int(elfs_number) for elfs_number in elfs.split()]
+    return winners_list, elfs_list
+
+def parse_card(line):
+    """
+    Parses a single line of data into bitmasks of its winning and elves' numbers.
+
+    Args:
+        line (str): A string representing a line of data in the format 'card_id: winners | elfs'.
+
+    Returns:
+        tuple: The winners bitmask and the elves' numbers bitmask, with bit n set for number n.
+    """
+    winners_list, elfs_list = tokenize_card(line)
+    winners_mask = 0
+    for winning_number in winners_list:
+        winners_mask |= 1 << winning_number
+    elfs_mask = 0
     for elfs_number in elfs_list:
-        if elfs_number in winners_dict:
-            winners_dict[elfs_number] = 1
-    # Calculating the lines score
-    score = 2**(sum(winners_dict.values()) - 1)
-    # Return correct score
-    if score < 1:
-        return 0
-    else:
-        return score
+        elfs_mask |= 1 << elfs_number
+    return winners_mask, elfs_mask
+
+def pre_line_calculation_two(line):
+    """
+    Processes a single line of data to calculate the number of matched numbers between winners and elves.
+
+    Args:
+        line (str): A string representing a line of data in the format 'card_id: winners | elfs'.
+
+    Returns:
+        int: The count of matched numbers between winners and elves.
+    """
+    winners_mask, elfs_mask = parse_card(line)
+    # Matched numbers are the bits set in both masks
+    return (winners_mask & elfs_mask).bit_count()
+
+def card_score(matches):
+    """
+    Calculates the score of a card from its number of matches.
+
+    Args:
+        matches (int): The count of matched numbers on the card.
+
+    Returns:
+        int: 2**(matches - 1), or 0 if there are no matches.
+    """
+    return 1 << (matches - 1) if matches else 0
+
+def pre_line_calculation_one(line):
+    """
+    Processes a single line of data to calculate and return the score based on winners and elves' numbers.
+
+    Args:
+        line (str): A string representing a line of data in the format 'card_id: winners | elfs'.
+
+    Returns:
+        int: The calculated score for the line. Returns 0 if the score is less than 1.
+    """
+    return card_score(pre_line_calculation_two(line))
+
+def parse_card_arrays(data):
+    """
+    Parses every card into rows of a winners array and an elves' numbers array.
+
+    Cards may hold different amounts of numbers, so rows are padded with -1
+    for winners and -2 for elves' numbers, which never match each other.
+
+    Args:
+        data (str): A string containing multiple lines of data, each line in the format 'card_id: winners | elfs'.
+
+    Returns:
+        tuple: A (cards x winners) array and a (cards x elfs) array of numbers.
+    """
+    cards = [tokenize_card(line) for line in data.split('\n') if line]
+    winners = np.full((len(cards), max((len(w) for w, _ in cards), default=0)), -1, dtype=np.int64)
+    elfs = np.full((len(cards), max((len(e) for _, e in cards), default=0)), -2, dtype=np.int64)
+    for i, (winners_list, elfs_list) in enumerate(cards):
+        winners[i, :len(winners_list)] = winners_list
+        elfs[i, :len(elfs_list)] = elfs_list
+    return winners, elfs
+
+def card_match_counts(data):
+    """
+    Parses every card once into its number of matches, using a vectorized membership test.
+
+    Args:
+        data (str): A string containing multiple lines of data, each line in the format 'card_id: winners | elfs'.
+
+    Returns:
+        np.ndarray: The count of matched numbers for each card.
+    """
+    winners, elfs = parse_card_arrays(data)
+    # A winning number matches if any of the elves' numbers on the same card equals it
+    return (winners[:, :, None] == elfs[:, None, :]).any(axis=2).sum(axis=1)
+
+def total_score(match_counts):
+    """
+    Calculates the total score of the cards from their numbers of matches.
+
+    Scores are summed as Python ints, so cards with 64 or more matches stay exact.
+
+    Args:
+        match_counts (np.ndarray): The count of matched numbers for each card.
+
+    Returns:
+        int: The sum of 2**(matches - 1) over the cards with matches.
+
+    Examples:
+        >>> total_score(np.array([0, 1, 3, 70]))
+        590295810358705651717
+    """
+    return sum(card_score(matches) for matches in match_counts.tolist())
 
 def calculate_winnings_one(data):
     """
@@ -37,37 +140,32 @@ def calculate_winnings_one(data):
     Returns:
         int: The total score calculated from all lines.
     """
-    # Separating data into lines
-    lines = data.split('\n')
-    # Total score calculator
-    total_score = 0
-    # Calculate the score per line
-    for line in lines:
-        total_score += pre_line_calculation_one(line)
-    return total_score
+    return total_score(card_match_counts(data))
 
-def pre_line_calculation_two(line):
+def count_cards(match_counts):
     """
-    Processes a single line of data to calculate the number of matched numbers between winners and elves.
+    Counts the scratch cards held once every card has won copies of the cards after it.
 
     Args:
-        line (str): A string representing a line of data in the format 'card_id: winners | elfs'.
+        match_counts (list): The count of matched numbers for each card.
 
     Returns:
-        int: The count of matched numbers between winners and elves.
+        int: The total number of scratch cards.
     """
-    # Remove card_id_info
-    _, card_info = line.split(': ')
-    # Split into winners and elfs numbers
-    winners, elfs = card_info.split(' | ')
-    winners_dict = {int(winning_number):0 for winning_number in winners.split()}
-    elfs_list =  [int(elfs_number) for elfs_number in elfs.split()]
-    # Adding matched numbers to winners dictionary
-    for elfs_number in elfs_list:
-        if elfs_number in winners_dict:
-            winners_dict[elfs_number] = 1
-    # Calculating the lines score
-    return sum(winners_dict.values())
+    # Difference array, copies won by a card are added over a range with two updates
+    won_copies = [0] * (len(match_counts) + 1)
+    running_copies = 0
+    total_cards = 0
+    for i, line_score in enumerate(match_counts):
+        # Prefix sum of the difference array gives the copies won of this card
+        running_copies += won_copies[i]
+        cards = 1 + running_copies
+        total_cards += cards
+        # Every one of these cards wins a copy of each of the next line_score cards
+        if line_score:
+            won_copies[i + 1] += cards
+            won_copies[min(i + 1 + line_score, len(match_counts))] -= cards
+    return total_cards
 
 def calculate_winnings_two(data):
     """
@@ -79,16 +177,66 @@ def calculate_winnings_two(data):
     Returns:
         int: The cumulative total score calculated from all lines.
     """
-    # Separating data into lines
-    lines = data.split('\n')
-    # Total score calculator
-    scratch_cards = {i:1 for i in range(len(lines))}
-    # Calculate the score per line
-    for i, line in enumerate(lines):
-        line_score = pre_line_calculation_two(line)
-        for j in range(line_score):
-            scratch_cards[i+j+1] += scratch_cards[i]
-    return sum(scratch_cards.values())
+    return count_cards(card_match_counts(data).tolist())
+
+def stream_winnings_two(lines):
+    """
+    Counts the scratch cards from a stream of lines in constant memory.
+
+    Only the pending copies of the next few cards are kept, in a ring buffer
+    of difference entries sized from the most winning numbers seen on a card
+    (the most matches a card can have). The buffer grows when a card with
+    more winning numbers turns up.
+
+    Args:
+        lines (iterable): Lines in the format 'card_id: winners | elfs', e.g. an open file.
+
+    Returns:
+        int: The total number of scratch cards.
+
+    Examples:
+        >>> stream_winnings_two(['Card 1: 1 | 9', 'Card 2: 4 5 | 4 5', 'Card 3: 7 | 8', 'Card 4: 7 | 8'])
+        6
+    """
+    won_copies = [0] * 2
+    running_copies = 0
+    total_cards = 0
+    for i, line in enumerate(filter(None, (line.rstrip('\n') for line in lines))):
+        winners_mask, elfs_mask = parse_card(line)
+        line_score = (winners_mask & elfs_mask).bit_count()
+        size = len(won_copies)
+        # Difference entries are only ever written up to the max matches + 1 cards ahead
+        needed = winners_mask.bit_count() + 2
+        if needed > size:
+            # Re-laying the pending slots of cards i onwards into a larger ring
+            grown = [0] * needed
+            for ahead in range(size):
+                grown[(i + ahead) % needed] = won_copies[(i + ahead) % size]
+            won_copies, size = grown, needed
+        # Reading (and freeing for reuse) this card's slot of the difference array
+        slot = i % size
+        running_copies += won_copies[slot]
+        won_copies[slot] = 0
+        cards = 1 + running_copies
+        total_cards += cards
+        # Every one of these cards wins a copy of each of the next line_score cards
+        if line_score:
+            won_copies[(i + 1) % size] += cards
+            won_copies[(i + 1 + line_score) % size] -= cards
+    return total_cards
+
+def calculate_winnings(data):
+    """
+    Calculates both challenge answers from a single pass over the data.
+
+    Args:
+        data (str): A string containing multiple lines of data, each line in the format 'card_id: winners | elfs'.
+
+    Returns:
+        tuple: The total score and the total number of scratch cards.
+    """
+    match_counts = card_match_counts(data)
+    return total_score(match_counts), count_cards(match_counts.tolist())
 
 if __name__ == "__main__":
     # Loading the data
@@ -96,8 +244,7 @@ if __name__ == "__main__":
         string = file.read()
 
     # Results
-    challenge_one_total = calculate_winnings_one(string)
-    challenge_two_total = calculate_winnings_two(string)
+    challenge_one_total, challenge_two_total = calculate_winnings(string)
 
     # Printing results
     print(f"Challenge One Answer: {challenge_one_total}")
@@ -1,5 +1,13 @@
+import hashlib
+import heapq
+import math
+import os
+import tempfile
 import numpy as np
-from typing import List, Tuple
+from bisect import bisect_left, bisect_right
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Value
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple, Union
 
 def structure_data_one(data: str) -> Tuple[List[int], List[List[List[int]]], List[str]]:
     """
@@ -48,7 +56,7 @@ def seed_to_location(seeds_list: List[int], mapping_data: List[List[List[int]]])
         pointer = seed
         for stage in mapping_data:
             for mapping in stage:
-                source_lower_bound, destination_lower_bound, range_length = mapping
+                destination_lower_bound, source_lower_bound, range_length = mapping
                 source_upper_bound = source_lower_bound + range_length
                 if source_lower_bound <= pointer < source_upper_bound:
                     pointer = destination_lower_bound + (pointer - source_lower_bound)
@@ -79,7 +87,7 @@ def structure_data_two(data: str) -> Tuple[np.ndarray, List[np.ndarray]]:
     seeds_array = np.array(seeds_list).reshape(-1, 2)
     mapping_array = [np.array([[int(item) for item in mapping_row.split()] for mapping_row in mapping_item.split('\n')[1:]])
                      for mapping_item in (test_item.split(':')[1] for test_item in items[1:])]
-    mapping_array = [np.array(sorted(inner_array, key=lambda x: x[0])) for inner_array in mapping_array]
+    mapping_array = [inner_array[np.argsort(inner_array[:, 0], kind='stable')] for inner_array in mapping_array]
 
     return seeds_array, mapping_array
 
@@ -118,18 +126,712 @@ def location_to_seed(seeds_array: np.ndarray, mapping_array: List[np.ndarray], c
             print(f"Checked location {location}")
         location += 1
 
+def check_disjoint(lower_bounds: np.ndarray, range_lengths: np.ndarray) -> None:
+    """
+    Checks that the ranges a stage maps from do not overlap.
+
+    The interval, piecewise and searchsorted engines all assume every value
+    falls in at most one mapping, unlike the first-match row scans, so
+    overlapping rows are rejected rather than silently mapped differently.
+
+    >>> check_disjoint(np.array([10, 12]), np.array([47, 7]))
+    Traceback (most recent call last):
+    ...
+    ValueError: Mapping ranges overlap at 12
+
+    Args:
+        lower_bounds (np.ndarray): The sorted lower bounds of the ranges.
+        range_lengths (np.ndarray): The matching range lengths.
+
+    Raises:
+        ValueError: If a range starts before the previous one ends.
+    """
+    lower_bounds, range_lengths = np.asarray(lower_bounds), np.asarray(range_lengths)
+    overlaps = np.flatnonzero(lower_bounds[1:] < lower_bounds[:-1] + range_lengths[:-1])
+    if overlaps.size:
+        raise ValueError(f"Mapping ranges overlap at {int(lower_bounds[overlaps[0] + 1])}")
+
+def map_ranges(ranges: List[Tuple[int, int]], stage: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Pushes half-open [start, end) ranges through one mapping stage.
+
+    Each range is split at the source boundaries of the stage's mappings, so
+    every piece is shifted by a single offset (or passes through unmapped).
+
+    Args:
+        ranges (List[Tuple[int, int]]): The ranges to map.
+        stage (np.ndarray): The mapping rows of the stage, as (destination, source, length),
+            with non-overlapping source ranges.
+
+    Returns:
+        List[Tuple[int, int]]: The mapped ranges.
+    """
+    # Walking the mappings in source order
+    mappings = sorted(stage.tolist(), key=lambda row: row[1])
+    check_disjoint(np.array([row[1] for row in mappings]), np.array([row[2] for row in mappings]))
+    mapped = []
+    for start, end in ranges:
+        for destination_lower_bound, source_lower_bound, range_length in mappings:
+            source_upper_bound = source_lower_bound + range_length
+            if source_upper_bound <= start:
+                continue
+            if source_lower_bound >= end:
+                break
+            # Unmapped piece before this mapping passes through unchanged
+            if start < source_lower_bound:
+                mapped.append((start, source_lower_bound))
+                start = source_lower_bound
+            # Overlapping piece is shifted into the destination range
+            overlap_end = min(end, source_upper_bound)
+            offset = destination_lower_bound - source_lower_bound
+            mapped.append((start + offset, overlap_end + offset))
+            start = overlap_end
+            if start >= end:
+                break
+        # Unmapped piece after the last mapping
+        if start < end:
+            mapped.append((start, end))
+    return mapped
+
+def seed_ranges_to_location(seeds_array: np.ndarray, mapping_array: List[np.ndarray]) -> int:
+    """
+    Finds the minimum location number for ranges of seed numbers.
+
+    Whole seed ranges are propagated through every stage, splitting them at
+    mapping boundaries, so the cost is O(ranges x mappings) rather than
+    depending on how large the ranges or the answer are.
+
+    Args:
+        seeds_array (np.ndarray): An array containing (start, length) ranges of seed numbers.
+        mapping_array (List[np.ndarray]): A list of NumPy arrays with mapping data.
+
+    Returns:
+        int: The lowest location number that corresponds to any of the seed numbers.
+    """
+    ranges = [(start, start + length) for start, length in seeds_array.tolist() if length > 0]
+    for stage in mapping_array:
+        ranges = map_ranges(ranges, stage)
+    return min(start for start, _ in ranges)
+
+class PiecewiseMap(NamedTuple):
+    """
+    A piecewise-linear map over [0, inf), as sorted breakpoints with one offset per segment.
+
+    A value x in [starts[i], starts[i + 1]) maps to x + offsets[i].
+
+    Attributes:
+        starts (np.ndarray): The sorted segment starts, the first always being 0.
+        offsets (np.ndarray): The offset added within each segment.
+    """
+    starts: np.ndarray
+    offsets: np.ndarray
+
+def merge_segments(segments: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Tidies (start, offset) segments in start order.
+
+    Later segments with the same start win, and neighbours with equal offsets are merged.
+
+    Args:
+        segments (Iterable[Tuple[int, int]]): The (start, offset) segments.
+
+    Returns:
+        List[Tuple[int, int]]: The merged segments.
+    """
+    merged = []
+    for start, offset in segments:
+        if merged and merged[-1][0] == start:
+            merged[-1] = (start, offset)
+            # The replacement may now match the segment before it
+            if len(merged) > 1 and merged[-2][1] == offset:
+                merged.pop()
+        elif not merged or merged[-1][1] != offset:
+            merged.append((start, offset))
+    return merged
+
+def piecewise_from_segments(segments: Iterable[Tuple[int, int]]) -> PiecewiseMap:
+    """
+    Builds a piecewise map from (start, offset) segments in start order.
+
+    Args:
+        segments (Iterable[Tuple[int, int]]): The (start, offset) segments, the first starting at 0.
+
+    Returns:
+        PiecewiseMap: The merged map.
+    """
+    starts, offsets = zip(*merge_segments(segments))
+    return PiecewiseMap(np.array(starts, dtype=np.int64), np.array(offsets, dtype=np.int64))
+
+def stage_to_piecewise(stage: np.ndarray, inverse: bool = False) -> PiecewiseMap:
+    """
+    Turns the mapping rows of one stage into a piecewise map.
+
+    Args:
+        stage (np.ndarray): The mapping rows of the stage, as (destination, source, length).
+        inverse (bool, optional): Map destination back to source, as `location_to_seed` walks. Defaults to False.
+
+    Returns:
+        PiecewiseMap: The stage as a piecewise map, unmapped values keeping an offset of 0.
+
+    Raises:
+        ValueError: If the ranges mapped from overlap.
+    """
+    from_column, to_column = (0, 1) if inverse else (1, 0)
+    rows = sorted(np.asarray(stage).reshape(-1, 3).tolist(), key=lambda row: row[from_column])
+    check_disjoint(np.array([row[from_column] for row in rows]), np.array([row[2] for row in rows]))
+    segments = []
+    cursor = 0
+    for row in rows:
+        lower_bound, range_length = row[from_column], row[2]
+        # Gap before this mapping passes through unchanged
+        if lower_bound > cursor:
+            segments.append((cursor, 0))
+        segments.append((lower_bound, row[to_column] - lower_bound))
+        cursor = lower_bound + range_length
+    segments.append((cursor, 0))
+    return piecewise_from_segments(segments)
+
+def compose_segments(segments: List[Tuple[int, int]], end: Optional[int], second: PiecewiseMap) -> List[Tuple[int, int]]:
+    """
+    Applies a piecewise map after a run of (start, offset) segments.
+
+    Args:
+        segments (List[Tuple[int, int]]): The (start, offset) segments applied first, in start order.
+        end (Optional[int]): Where the last segment ends, None for no end.
+        second (PiecewiseMap): The map applied to the results of the segments.
+
+    Returns:
+        List[Tuple[int, int]]: The composed segments, covering the same values.
+    """
+    second_starts, second_offsets = second.starts.tolist(), second.offsets.tolist()
+    composed = []
+    for i, (start, offset) in enumerate(segments):
+        segment_end = segments[i + 1][0] if i + 1 < len(segments) else end
+        # Splitting the image of this segment at the second map's breakpoints
+        j = bisect_right(second_starts, start + offset) - 1
+        composed.append((start, offset + second_offsets[j]))
+        for j in range(j + 1, len(second_starts)):
+            if segment_end is not None and second_starts[j] >= segment_end + offset:
+                break
+            composed.append((second_starts[j] - offset, offset + second_offsets[j]))
+    return composed
+
+def compose_maps(first: PiecewiseMap, second: PiecewiseMap) -> PiecewiseMap:
+    """
+    Composes two piecewise maps into one that applies first, then second.
+
+    Args:
+        first (PiecewiseMap): The map applied first.
+        second (PiecewiseMap): The map applied to the results of the first.
+
+    Returns:
+        PiecewiseMap: The composed map.
+    """
+    return piecewise_from_segments(compose_segments(list(zip(first.starts.tolist(), first.offsets.tolist())), None, second))
+
+def compose_stages(mapping_array: List[np.ndarray]) -> Tuple[PiecewiseMap, PiecewiseMap]:
+    """
+    Composes every stage into a single seed-to-location map and its inverse.
+
+    Args:
+        mapping_array (List[np.ndarray]): A list of NumPy arrays with mapping data.
+
+    Returns:
+        Tuple[PiecewiseMap, PiecewiseMap]:
+        - The seed to location map.
+        - The location to seed map, walking the stages backwards as `location_to_seed` does.
+    """
+    forward = stage_to_piecewise(mapping_array[0])
+    for stage in mapping_array[1:]:
+        forward = compose_maps(forward, stage_to_piecewise(stage))
+    inverse = stage_to_piecewise(mapping_array[-1], inverse=True)
+    for stage in reversed(mapping_array[:-1]):
+        inverse = compose_maps(inverse, stage_to_piecewise(stage, inverse=True))
+    return forward, inverse
+
+def apply_map(piecewise_map: PiecewiseMap, values: Union[int, np.ndarray]) -> Union[int, np.ndarray]:
+    """
+    Maps one value or an array of values with a binary search over the breakpoints.
+
+    Args:
+        piecewise_map (PiecewiseMap): The map to apply.
+        values (Union[int, np.ndarray]): The value or values to map.
+
+    Returns:
+        Union[int, np.ndarray]: The mapped value or values.
+    """
+    segment = np.searchsorted(piecewise_map.starts, values, side='right') - 1
+    return values + piecewise_map.offsets[segment]
+
+def map_stage_array(values: np.ndarray, from_bounds: np.ndarray, to_bounds: np.ndarray, range_lengths: np.ndarray) -> np.ndarray:
+    """
+    Maps an array of values through one stage with a searchsorted and a masked offset add.
+
+    Args:
+        values (np.ndarray): The values to map.
+        from_bounds (np.ndarray): The sorted lower bounds of the ranges being mapped from.
+        to_bounds (np.ndarray): The matching lower bounds of the ranges being mapped to.
+        range_lengths (np.ndarray): The matching range lengths.
+
+    Returns:
+        np.ndarray: The mapped values, unmapped values passing through unchanged.
+
+    Raises:
+        ValueError: If the ranges mapped from overlap, as only the last one starting below a value is looked at.
+    """
+    check_disjoint(from_bounds, range_lengths)
+    # Last mapping starting at or below each value, if its range covers the value
+    candidate = np.searchsorted(from_bounds, values, side='right') - 1
+    clipped = np.maximum(candidate, 0)
+    inside = (candidate >= 0) & (values < from_bounds[clipped] + range_lengths[clipped])
+    return values + np.where(inside, to_bounds[clipped] - from_bounds[clipped], 0)
+
+def batch_seed_to_location(seeds: np.ndarray, mapping_array: List[np.ndarray]) -> Tuple[np.ndarray, int]:
+    """
+    Maps a whole array of seeds to locations, one vectorized step per stage.
+
+    Within each stage the mappings are ordered by source, a searchsorted finds
+    the candidate mapping of every value and a masked add applies its offset.
+
+    Args:
+        seeds (np.ndarray): The seed numbers.
+        mapping_array (List[np.ndarray]): A list of NumPy arrays with mapping data.
+
+    Returns:
+        Tuple[np.ndarray, int]:
+        - The location of every seed.
+        - The lowest of those locations.
+    """
+    values = np.asarray(seeds, dtype=np.int64)
+    for stage in mapping_array:
+        # Stages come sorted by destination, the forward search needs them by source
+        stage = stage[np.argsort(stage[:, 1], kind='stable')]
+        values = map_stage_array(values, stage[:, 1], stage[:, 0], stage[:, 2])
+    return values, int(values.min())
+
+# Search state of each worker process, set once by `_init_search_worker`
+_search_state = None
+
+def _init_search_worker(seeds_array: np.ndarray, mapping_array: List[np.ndarray], best_location: Value) -> None:
+    """
+    Stores the almanac and the shared best hit in a worker process.
+
+    Args:
+        seeds_array (np.ndarray): An array containing ranges of seed numbers.
+        mapping_array (List[np.ndarray]): A list of NumPy arrays with mapping data.
+        best_location (Value): Shared lowest location found so far, -1 while there is none.
+    """
+    global _search_state
+    seeds_array = seeds_array[np.argsort(seeds_array[:, 0])]
+    _search_state = (seeds_array, mapping_array, best_location)
+
+def search_location_block(start: int, stop: int) -> Optional[int]:
+    """
+    Maps a block of locations back to seeds and finds the first one in a seed range.
+
+    Runs inside a worker process, skipping the block if a lower location has
+    already been found by another worker.
+
+    Args:
+        start (int): The first location of the block.
+        stop (int): One past the last location of the block.
+
+    Returns:
+        Optional[int]: The lowest location in the block that maps into a seed range, None if
+        there is none or the block was cancelled.
+    """
+    seeds_array, mapping_array, best_location = _search_state
+    # Cancelled if a lower block has already reported a hit
+    best = best_location.value
+    if 0 <= best < start:
+        return None
+    pointers = np.arange(start, stop, dtype=np.int64)
+    for stage in reversed(mapping_array):
+        pointers = map_stage_array(pointers, stage[:, 0], stage[:, 1], stage[:, 2])
+    # Checking every pointer against the seed range starting at or below it
+    seed_lower_bounds, range_lengths = seeds_array[:, 0], seeds_array[:, 1]
+    candidate = np.searchsorted(seed_lower_bounds, pointers, side='right') - 1
+    clipped = np.maximum(candidate, 0)
+    hits = np.flatnonzero((candidate >= 0) & (pointers < seed_lower_bounds[clipped] + range_lengths[clipped]))
+    if hits.size == 0:
+        return None
+    location = start + int(hits[0])
+    with best_location.get_lock():
+        if best_location.value < 0 or location < best_location.value:
+            best_location.value = location
+    return location
+
+def parallel_location_to_seed(seeds_array: np.ndarray, mapping_array: List[np.ndarray], start: int = 0,
+                              stop: Optional[int] = None, block_size: int = 1 << 20, processes: Optional[int] = None,
+                              progress: Optional[Callable[[int, int], None]] = None) -> Optional[int]:
+    """
+    Finds the lowest location that maps back into a seed range, searching blocks in parallel.
+
+    Contiguous blocks of locations are handed to a pool of workers in order.
+    Once a block reports a hit, no higher block is started and blocks already
+    queued above it are cancelled; only the blocks below it are waited for.
+
+    Args:
+        seeds_array (np.ndarray): An array containing ranges of seed numbers.
+        mapping_array (List[np.ndarray]): A list of NumPy arrays with mapping data.
+        start (int, optional): The first location to check. Defaults to 0.
+        stop (Optional[int]): One past the last location to check, defaults to searching until a hit.
+        block_size (int, optional): Locations mapped by a worker at a time. Defaults to 1 << 20.
+        processes (Optional[int]): Number of worker processes, defaults to the core count.
+        progress (Optional[Callable[[int, int], None]]): Called with (start, stop) of every finished block.
+
+    Returns:
+        Optional[int]: The lowest matching location, None if there is none before stop.
+    """
+    processes = processes or os.cpu_count() or 1
+    best_location = Value('q', -1)
+    best = None
+    next_block = start
+    in_flight = {}
+    with ProcessPoolExecutor(processes, initializer=_init_search_worker,
+                             initargs=(seeds_array, mapping_array, best_location)) as executor:
+        while True:
+            # Keeping every worker busy until a hit is found
+            while best is None and len(in_flight) < processes * 2 and (stop is None or next_block < stop):
+                block_stop = next_block + block_size if stop is None else min(next_block + block_size, stop)
+                in_flight[executor.submit(search_location_block, next_block, block_stop)] = (next_block, block_stop)
+                next_block = block_stop
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                block = in_flight.pop(future)
+                location = future.result()
+                if location is not None and (best is None or location < best):
+                    best = location
+                if progress is not None:
+                    progress(*block)
+            # Blocks above the best hit can no longer matter
+            if best is not None:
+                for future, (block_start, _) in list(in_flight.items()):
+                    if block_start > best:
+                        future.cancel()
+                        del in_flight[future]
+    return best
+
+class CompiledAlmanac(NamedTuple):
+    """
+    A parsed and composed almanac, as stored in the on-disk cache.
+
+    Attributes:
+        seeds_array (np.ndarray): An array containing ranges of seed numbers.
+        mapping_array (List[np.ndarray]): The mapping stages, each sorted by destination.
+        seed_map (PiecewiseMap): The composed seed to location map.
+        location_map (PiecewiseMap): The composed location to seed map.
+    """
+    seeds_array: np.ndarray
+    mapping_array: List[np.ndarray]
+    seed_map: PiecewiseMap
+    location_map: PiecewiseMap
+
+def compile_almanac(path: str, cache_dir: Optional[str] = None) -> CompiledAlmanac:
+    """
+    Loads an almanac through an on-disk cache of its parsed and composed tables.
+
+    The cache entry is a directory of .npy files named by the SHA-256 of the
+    almanac, so later runs on the same input memory-map the tables and skip
+    parsing and composition entirely. Plain .npy files are used rather than
+    .npz, as only those can be memory-mapped.
+
+    Args:
+        path (str): Path to the almanac text file.
+        cache_dir (Optional[str]): Directory holding the cache, defaults to '.almanac_cache' next to the file.
+
+    Returns:
+        CompiledAlmanac: The almanac tables, memory-mapped when loaded from the cache.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), '.almanac_cache')
+    entry = os.path.join(cache_dir, hashlib.sha256(data).hexdigest())
+    if not os.path.isdir(entry):
+        seeds_array, mapping_array = structure_data_two(data.decode('utf-8'))
+        seed_map, location_map = compose_stages(mapping_array)
+        tables = {
+            'seeds': seeds_array,
+            'seed_map_starts': seed_map.starts,
+            'seed_map_offsets': seed_map.offsets,
+            'location_map_starts': location_map.starts,
+            'location_map_offsets': location_map.offsets,
+        }
+        tables.update((f'stage_{i}', stage) for i, stage in enumerate(mapping_array))
+        # Writing to a scratch directory first, so a cache entry is never seen half written
+        os.makedirs(cache_dir, exist_ok=True)
+        scratch = tempfile.mkdtemp(dir=cache_dir)
+        for name, table in tables.items():
+            np.save(os.path.join(scratch, f'{name}.npy'), np.ascontiguousarray(table, dtype=np.int64))
+        try:
+            os.rename(scratch, entry)
+        except OSError:
+            # Another run finished the same entry first
+            for name in tables:
+                os.remove(os.path.join(scratch, f'{name}.npy'))
+            os.rmdir(scratch)
+
+    def load(name: str) -> np.ndarray:
+        return np.load(os.path.join(entry, f'{name}.npy'), mmap_mode='r')
+
+    stages = sum(1 for name in os.listdir(entry) if name.startswith('stage_'))
+    return CompiledAlmanac(
+        load('seeds'),
+        [load(f'stage_{i}') for i in range(stages)],
+        PiecewiseMap(load('seed_map_starts'), load('seed_map_offsets')),
+        PiecewiseMap(load('location_map_starts'), load('location_map_offsets')),
+    )
+
+class Almanac:
+    """
+    An almanac whose composed seed to location map follows edits to single mapping rows.
+
+    The compositions of the stages before and after each stage are cached, so
+    editing a row only recomposes the seeds whose values pass through the
+    changed source range, and those segments are spliced into the composed map.
+    Each segment's lowest seed location sits in a heap, so the minimum over
+    the seed ranges is updated from the spliced segments alone.
+
+    >>> seeds = np.array([[79, 14], [55, 13]])
+    >>> stages = [np.array([[50, 98, 2], [52, 50, 48]]), np.array([[0, 15, 37], [37, 52, 2], [39, 0, 15]])]
+    >>> almanac = Almanac(seeds, stages)
+    >>> almanac.add_row(1, 5, 60, 20)
+    >>> almanac.remove_row(0, 1)
+    >>> almanac.lowest_location() == Almanac(seeds, [np.array(rows) for rows in almanac.stages]).lowest_location()
+    True
+    >>> almanac.add_row(1, 200, 70, 5)
+    Traceback (most recent call last):
+    ...
+    ValueError: Mapping ranges overlap at 70
+
+    Attributes:
+        seed_ranges (List[Tuple[int, int]]): Sorted, merged [start, end) seed ranges.
+        stages (List[List[List[int]]]): The (destination, source, length) rows of each stage.
+        stage_maps (List[PiecewiseMap]): Each stage as a piecewise map.
+        starts (List[int]): The composed seed to location segment starts.
+        offsets (List[int]): The composed seed to location segment offsets.
+    """
+    def __init__(self, seeds_array: np.ndarray, mapping_array: List[np.ndarray]):
+        self.seed_ranges = []
+        for start, length in sorted(np.asarray(seeds_array).tolist()):
+            if self.seed_ranges and start <= self.seed_ranges[-1][1]:
+                self.seed_ranges[-1] = (self.seed_ranges[-1][0], max(self.seed_ranges[-1][1], start + length))
+            elif length > 0:
+                self.seed_ranges.append((start, start + length))
+        self.stages = [np.asarray(stage).tolist() for stage in mapping_array]
+        self.stage_maps = [stage_to_piecewise(stage) for stage in mapping_array]
+        identity = PiecewiseMap(np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64))
+        # Compositions of stages[:k] and stages[k:], keyed by k
+        self._prefix = {0: identity}
+        self._suffix = {len(self.stages): identity}
+        seed_map = self._prefix_map(len(self.stages))
+        self.starts, self.offsets = seed_map.starts.tolist(), seed_map.offsets.tolist()
+        self._heap = []
+        for i in range(len(self.starts)):
+            self._push_segment(i)
+
+    @property
+    def seed_map(self) -> PiecewiseMap:
+        """The composed seed to location map."""
+        return PiecewiseMap(np.array(self.starts, dtype=np.int64), np.array(self.offsets, dtype=np.int64))
+
+    def _prefix_map(self, k: int) -> PiecewiseMap:
+        """Composition of the stages before stage k, extending the nearest cached one."""
+        j = max(key for key in self._prefix if key <= k)
+        for j in range(j, k):
+            self._prefix[j + 1] = compose_maps(self._prefix[j], self.stage_maps[j])
+        return self._prefix[k]
+
+    def _suffix_map(self, k: int) -> PiecewiseMap:
+        """Composition of the stages from stage k on, extending the nearest cached one."""
+        j = min(key for key in self._suffix if key >= k)
+        for j in range(j, k, -1):
+            self._suffix[j - 1] = compose_maps(self.stage_maps[j - 1], self._suffix[j])
+        return self._suffix[k]
+
+    def _segment_end(self, i: int) -> float:
+        """End of composed segment i, infinite for the last one."""
+        return self.starts[i + 1] if i + 1 < len(self.starts) else math.inf
+
+    def _push_segment(self, i: int) -> None:
+        """Adds the lowest location of the seeds in composed segment i to the heap."""
+        start, end = self.starts[i], self._segment_end(i)
+        # First seed at or after the segment start
+        k = bisect_right(self.seed_ranges, (start, math.inf)) - 1
+        if k >= 0 and self.seed_ranges[k][1] > start:
+            seed = start
+        elif k + 1 < len(self.seed_ranges) and self.seed_ranges[k + 1][0] < end:
+            seed = self.seed_ranges[k + 1][0]
+        else:
+            return
+        heapq.heappush(self._heap, (seed + self.offsets[i], start, end, self.offsets[i]))
+
+    def lowest_location(self) -> Optional[int]:
+        """
+        Finds the lowest location of any seed in the seed ranges.
+
+        Returns:
+            Optional[int]: The lowest location, None if there are no seeds.
+        """
+        while self._heap:
+            location, start, end, offset = self._heap[0]
+            # Heap entries of segments that have since been replaced are dropped lazily
+            i = bisect_left(self.starts, start)
+            if i < len(self.starts) and self.starts[i] == start and self.offsets[i] == offset and self._segment_end(i) == end:
+                return location
+            heapq.heappop(self._heap)
+        return None
+
+    def add_row(self, stage: int, destination: int, source: int, length: int) -> None:
+        """
+        Adds a mapping row to a stage.
+
+        Args:
+            stage (int): The index of the stage.
+            destination (int): The destination lower bound.
+            source (int): The source lower bound.
+            length (int): The range length.
+        """
+        self._edit(stage, None, [destination, source, length])
+
+    def remove_row(self, stage: int, index: int) -> None:
+        """
+        Removes a mapping row from a stage.
+
+        Args:
+            stage (int): The index of the stage.
+            index (int): The position of the row in `stages[stage]`.
+        """
+        self._edit(stage, index, None)
+
+    def change_row(self, stage: int, index: int, destination: int, source: int, length: int) -> None:
+        """
+        Replaces a mapping row of a stage.
+
+        Args:
+            stage (int): The index of the stage.
+            index (int): The position of the row in `stages[stage]`.
+            destination (int): The new destination lower bound.
+            source (int): The new source lower bound.
+            length (int): The new range length.
+        """
+        self._edit(stage, index, [destination, source, length])
+
+    def _edit(self, stage: int, index: Optional[int], row: Optional[List[int]]) -> None:
+        """
+        Applies a row edit and recomposes the affected part of the seed to location map.
+
+        Args:
+            stage (int): The index of the stage.
+            index (Optional[int]): The position of the row being replaced or removed, None to add.
+            row (Optional[List[int]]): The new (destination, source, length) row, None to remove.
+
+        Raises:
+            ValueError: If the edit would leave overlapping source ranges, in which case nothing changes.
+        """
+        rows = list(self.stages[stage])
+        # Source ranges of the stage whose mapping changes
+        changed = []
+        if index is not None:
+            _, source, length = rows[index]
+            changed.append((source, source + length))
+            if row is None:
+                del rows[index]
+            else:
+                rows[index] = row
+        else:
+            rows.append(row)
+        if row is not None:
+            changed.append((row[1], row[1] + row[2]))
+        # Building the new stage map first validates the rows before anything is replaced
+        self.stage_maps[stage] = stage_to_piecewise(np.array(rows, dtype=np.int64).reshape(-1, 3))
+        self.stages[stage] = rows
+        # Cached compositions that include this stage are stale
+        self._prefix = {key: value for key, value in self._prefix.items() if key <= stage}
+        self._suffix = {key: value for key, value in self._suffix.items() if key > stage}
+        prefix, suffix = self._prefix_map(stage), self._suffix_map(stage + 1)
+        # Seed intervals whose values reach this stage inside a changed source range
+        prefix_starts, prefix_offsets = prefix.starts.tolist(), prefix.offsets.tolist()
+        affected = []
+        for i, (start, offset) in enumerate(zip(prefix_starts, prefix_offsets)):
+            end = prefix_starts[i + 1] if i + 1 < len(prefix_starts) else math.inf
+            for lower_bound, upper_bound in changed:
+                seed_start, seed_end = max(start, lower_bound - offset), min(end, upper_bound - offset)
+                if seed_start < seed_end:
+                    affected.append((seed_start, seed_end))
+        for seed_start, seed_end in self._merge_intervals(sorted(affected)):
+            # Prefix segments restricted to this interval, pushed through the edited stage and the rest
+            i = bisect_right(prefix_starts, seed_start) - 1
+            segments = [(seed_start, prefix_offsets[i])]
+            for i in range(i + 1, len(prefix_starts)):
+                if prefix_starts[i] >= seed_end:
+                    break
+                segments.append((prefix_starts[i], prefix_offsets[i]))
+            end = None if seed_end == math.inf else seed_end
+            segments = compose_segments(segments, end, self.stage_maps[stage])
+            self._splice(seed_start, seed_end, compose_segments(segments, end, suffix))
+
+    @staticmethod
+    def _merge_intervals(intervals: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
+        """Merges sorted, possibly overlapping [start, end) intervals."""
+        merged = []
+        for start, end in intervals:
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def _splice(self, seed_start: int, seed_end: float, segments: List[Tuple[int, int]]) -> None:
+        """
+        Replaces the composed map over [seed_start, seed_end) with new segments.
+
+        Args:
+            seed_start (int): Start of the replaced seed interval.
+            seed_end (float): End of the replaced seed interval, may be infinite.
+            segments (List[Tuple[int, int]]): The new (start, offset) segments over the interval.
+        """
+        first = bisect_right(self.starts, seed_start) - 1
+        window = []
+        # Keeping the segment before for merging, and the start of the one being cut into
+        if first > 0:
+            window.append((self.starts[first - 1], self.offsets[first - 1]))
+        if self.starts[first] < seed_start:
+            window.append((self.starts[first], self.offsets[first]))
+        window.extend(segments)
+        last = len(self.starts)
+        if seed_end != math.inf:
+            # The segment holding seed_end carries on past the interval
+            after = bisect_right(self.starts, seed_end) - 1
+            window.append((seed_end, self.offsets[after]))
+            last = after + 1
+            if last < len(self.starts):
+                window.append((self.starts[last], self.offsets[last]))
+                last += 1
+        window = merge_segments(window)
+        low = max(first - 1, 0)
+        self.starts[low:last] = [start for start, _ in window]
+        self.offsets[low:last] = [offset for _, offset in window]
+        for i in range(low, low + len(window)):
+            self._push_segment(i)
+
 if __name__ == "__main__":
     # Loading data from a text file
     with open('data.txt', 'r', encoding='utf-8') as file:
         string = file.read()
 
+    # Composing every stage into a single seed to location map
+    seeds_array, mapping_array = structure_data_two(string)
+    seed_map, _ = compose_stages(mapping_array)
+
     # Solving the first challenge
-    seeds_list, mapping_data, _ = structure_data_one(string)
-    challenge_one_result = seed_to_location(seeds_list, mapping_data)
+    seeds_list, _, _ = structure_data_one(string)
+    challenge_one_result = int(apply_map(seed_map, np.array(seeds_list)).min())
 
     # Solving the second challenge
-    seeds_array, mapping_array = structure_data_two(string)
-    challenge_two_result = location_to_seed(seeds_array, mapping_array)
+    challenge_two_result = seed_ranges_to_location(seeds_array, mapping_array)
 
     # Displaying results
     print(f"Challenge One Answer: {challenge_one_result}")
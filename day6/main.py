@@ -21,6 +21,33 @@ def parse_data_challenge_one(data: str) -> Tuple[List[int], List[int]]:
 
     return time, distance
 
+def winning_hold_range(time: int, distance: int) -> Tuple[int, int]:
+    """
+    Finds the shortest and longest button holds that beat the record distance.
+
+    Holding for j wins when j * (time - j) > distance, which rearranges to
+    (2j - time)**2 < time**2 - 4 * distance. With r the largest integer whose
+    square is below that discriminant (an exact `math.isqrt`), the winning
+    holds are those with |2j - time| <= r, so ties with the record never count
+    and the cost is O(1) for integers of any size.
+
+    Args:
+        time (int): The time value.
+        distance (int): The record distance.
+
+    Returns:
+        Tuple[int, int]: The lowest and highest winning holds, the highest being one below
+        the lowest when no hold wins.
+    """
+    discriminant = time * time - 4 * distance
+    if discriminant <= 0:
+        return time // 2 + 1, time // 2
+    root = math.isqrt(discriminant - 1)
+    # 2j - time always has the same parity as time
+    if (root - time) % 2:
+        root -= 1
+    return (time - root) // 2, (time + root) // 2
+
 def calculate_result_range(time: List[int], distance: List[int]) -> int:
     """
     Calculates the product of the ranges for each time and distance pair for Challenge 1.
@@ -37,22 +64,9 @@ def calculate_result_range(time: List[int], distance: List[int]) -> int:
         int: The product of the result ranges for each time and distance pair.
     """
     results = 1
-    for i, t in enumerate(time):
-        d = distance[i]
-        result_range = []
-        # Forwards pass to find the earliest time
-        for j in range(1, t):
-            if d < j * (t - j):
-                result_range.append(j)
-                break
-        # Backwards pass to find the latest time
-        for j in reversed(range(1, t)):
-            if d < j * (t - j):
-                result_range.append(j)
-                break
-        # Calculating the range and updating the overall result
-        result = result_range[1] - result_range[0] + 1
-        results *= result
+    for t, d in zip(time, distance):
+        lower_bound, upper_bound = winning_hold_range(t, d)
+        results *= upper_bound - lower_bound + 1
     return results
 
 def parse_data_challenge_two(data: str) -> Tuple[int, int]:
@@ -77,29 +91,16 @@ def find_bounds(time: int, distance: int, left: bool = True) -> int:
     """
     Finds the bounds for a given time and distance for Challenge 2.
 
-    This function uses a binary search approach to find the lower or upper bound
-    at which the product of the time and its complement meets the distance criteria.
-
     Args:
         time (int): The time value.
         distance (int): The distance value.
         left (bool, optional): Flag to determine the direction of bound calculation. Defaults to True.
 
     Returns:
-        int: The calculated bound based on the time and distance.
+        int: The lowest winning hold if left, otherwise the highest.
     """
-    lower_bound = 0
-    upper_bound = time
-    while upper_bound - lower_bound > 1:
-        pointer = (upper_bound + lower_bound) // 2
-        this_distance = pointer * (time - pointer)
-        if (this_distance > distance) == left:
-            upper_bound = pointer
-        else:
-            lower_bound = pointer
-
-    # Adjusting the pointer based on the final comparison
-    return pointer + (1 if this_distance < distance and left else 0) - (1 if this_distance >= distance and not left else 0)
+    lower_bound, upper_bound = winning_hold_range(time, distance)
+    return lower_bound if left else upper_bound
 
 def find_range(data: str) -> int:
     """
@@ -112,8 +113,7 @@ def find_range(data: str) -> int:
         int: The calculated range based on the time and distance data.
     """
     time, distance = parse_data_challenge_two(data)
-    lower_bound = find_bounds(time, distance)
-    upper_bound = find_bounds(time, distance, False)
+    lower_bound, upper_bound = winning_hold_range(time, distance)
 
     return upper_bound - lower_bound + 1
 